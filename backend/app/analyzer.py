@@ -3,11 +3,31 @@ import json
 import re
 from app.config import get_settings
 from app.schemas import AnalyzeResponse, PricingIssue, TierAnalysis, IssueType, SeverityLevel
-from app.metrics import analyses_total, issues_detected, TOOL_NAME
+from app.metrics import tokens_consumed, TOOL_NAME
 
-ANALYSIS_PROMPT = """You are a pricing transparency analyst. Your job is to analyze SaaS pricing pages and detect hidden fees, fake free tiers, and misleading pricing tactics.
+# Bump whenever SYSTEM_PROMPT changes so token metrics can be compared per version
+PROMPT_VERSION = "4"
+TRANSLATION_PROMPT_VERSION = "translate-2"
 
-Analyze the following pricing page content and identify ALL issues:
+ANALYSIS_MODEL = "claude-sonnet-4-20250514"
+TRANSLATION_MODEL = "claude-3-5-haiku-20241022"
+
+ANALYSIS_MAX_TOKENS = 4000
+# Nearly all analysis output is free text, and zh/ja/ko translations usually
+# need more tokens than the English, so allow the model's full output limit
+TRANSLATION_MAX_TOKENS = 8192
+
+# Analyses are produced once in this language and translated on demand
+CANONICAL_LANGUAGE = "en"
+
+# Static instruction block sent as the system message. It must stay byte-identical
+# across requests so the provider can serve it from its prompt cache; anything
+# request-specific (page content) goes into the user message instead. At roughly
+# 450 tokens it is below Sonnet's 1024-token caching minimum, so the marker is a
+# no-op for now; check the cached/cache_write token counters before growing it.
+SYSTEM_PROMPT = """You are a pricing transparency analyst. Your job is to analyze SaaS pricing pages and detect hidden fees, fake free tiers, and misleading pricing tactics.
+
+Analyze the pricing page content provided by the user and identify ALL issues:
 
 ## Issue Types to Detect:
 
@@ -20,51 +40,118 @@ Analyze the following pricing page content and identify ALL issues:
 7. **required_addon** - Core functionality requires paid add-ons
 8. **bait_switch** - "Starting at" prices that don't apply to realistic use cases
 
-## Pricing Page Content:
-{content}
-
 ## Respond in JSON format:
-{{
+{
   "tool_name": "Name of the tool (extract from content or use 'Unknown')",
   "overall_score": <0-100, where 100 is completely honest>,
   "verdict": "One sentence verdict",
   "issues": [
-    {{
+    {
       "type": "<issue_type>",
       "severity": "low|medium|high|critical",
       "title": "Short title",
       "description": "Detailed explanation",
       "evidence": "Exact quote from pricing page",
       "recommendation": "What users should know"
-    }}
+    }
   ],
   "tiers": [
-    {{
+    {
       "name": "Tier name",
       "stated_price": "$X/month",
       "true_cost_estimate": "Realistic cost for typical usage",
       "limitations": ["Limitation 1", "Limitation 2"],
       "hidden_requirements": ["Requirement 1"]
-    }}
+    }
   ],
   "summary": "2-3 sentence summary of findings",
   "recommendations": ["Recommendation 1", "Recommendation 2"]
-}}
+}
 
 Be thorough but fair. Only flag real issues with evidence."""
 
+TRANSLATION_PROMPT = """You translate pricing analysis reports for end users.
 
-async def analyze_pricing(content: str, tool_name: str | None, language: str) -> AnalyzeResponse:
-    """Analyze pricing content using LLM"""
-    settings = get_settings()
+The user message is a JSON object with the free-text fields of a report written in English, followed by the target language code.
+
+Rules:
+- Translate every string value into the target language
+- Keep the exact same JSON structure, keys, list lengths and order
+- Copy every "index" value unchanged
+- Keep prices, currencies, numbers and product names unchanged
+- Respond with the translated JSON object only"""
+
+
+def cached_system(prompt: str) -> dict:
+    """System message marked for provider prompt caching"""
+    return {
+        "role": "system",
+        "content": [
+            {
+                "type": "text",
+                "text": prompt,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ]
+    }
+
+
+def build_messages(content: str) -> list[dict]:
+    """Build chat messages: cacheable static prefix first, variable suffix last"""
+    return [
+        cached_system(SYSTEM_PROMPT),
+        {"role": "user", "content": f"## Pricing Page Content:\n{content[:15000]}"}  # Limit content size
+    ]
+
+
+def record_usage(usage: dict | None, prompt_version: str = PROMPT_VERSION) -> None:
+    """Record token usage reported by the LLM proxy"""
+    if not usage:
+        return
     
-    # Build prompt
-    prompt = ANALYSIS_PROMPT.format(content=content[:15000])  # Limit content size
+    details = usage.get("prompt_tokens_details") or {}
+    cache_read = usage.get("cache_read_input_tokens") or 0
+    cache_write = usage.get("cache_creation_input_tokens") or 0
     
-    if language != "en":
-        prompt += f"\n\nIMPORTANT: Respond in {language} language."
+    if "prompt_tokens" in usage:
+        # OpenAI-style: prompt_tokens already includes cached tokens
+        prompt = usage["prompt_tokens"] or 0
+        cached = details.get("cached_tokens") or cache_read
+        completion = usage.get("completion_tokens") or 0
+    else:
+        # Anthropic-style: input_tokens excludes cache reads and writes
+        prompt = (usage.get("input_tokens") or 0) + cache_read + cache_write
+        cached = cache_read
+        completion = usage.get("output_tokens") or 0
+    
+    counts = {
+        "prompt": prompt,
+        "cached": cached,
+        "cache_write": cache_write,
+        "completion": completion,
+    }
+    for token_type, count in counts.items():
+        if count:
+            tokens_consumed.labels(
+                tool=TOOL_NAME, token_type=token_type, prompt_version=prompt_version
+            ).inc(count)
+
+
+def parse_json(content_text: str) -> dict:
+    """Extract JSON from an LLM reply (handle markdown code blocks)"""
+    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)```', content_text)
+    if json_match:
+        json_str = json_match.group(1)
+    else:
+        json_str = content_text
+    
+    return json.loads(json_str)
+
+
+async def complete_json(messages: list[dict], model: str, max_tokens: int, prompt_version: str) -> dict:
+    """Call the LLM proxy and return the parsed JSON reply"""
+    settings = get_settings()
     
-    # Call LLM proxy
     async with httpx.AsyncClient(timeout=60.0) as client:
         response = await client.post(
             f"{settings.llm_proxy_url}/v1/chat/completions",
@@ -73,32 +160,27 @@ async def analyze_pricing(content: str, tool_name: str | None, language: str) ->
                 "Content-Type": "application/json"
             },
             json={
-                "model": "claude-sonnet-4-20250514",
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": 4000
+                "model": model,
+                "messages": messages,
+                "max_tokens": max_tokens
             }
         )
         response.raise_for_status()
         data = response.json()
     
-    # Parse response
-    content_text = data["choices"][0]["message"]["content"]
-    
-    # Extract JSON from response (handle markdown code blocks)
-    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)```', content_text)
-    if json_match:
-        json_str = json_match.group(1)
-    else:
-        json_str = content_text
+    record_usage(data.get("usage"), prompt_version)
     
-    result = json.loads(json_str)
-    
-    # Track metrics
-    analyses_total.labels(tool=TOOL_NAME).inc()
-    for issue in result.get("issues", []):
-        issues_detected.labels(tool=TOOL_NAME, issue_type=issue.get("type", "unknown")).inc()
+    return parse_json(data["choices"][0]["message"]["content"])
+
+
+async def analyze_pricing(content: str, tool_name: str | None) -> AnalyzeResponse:
+    """Analyze pricing content using LLM, in CANONICAL_LANGUAGE"""
+    result = await complete_json(
+        build_messages(content),
+        model=ANALYSIS_MODEL,
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        prompt_version=PROMPT_VERSION
+    )
     
     # Build response
     return AnalyzeResponse(
@@ -127,5 +209,84 @@ async def analyze_pricing(content: str, tool_name: str | None, language: str) ->
             for tier in result.get("tiers", [])
         ],
         summary=result.get("summary", ""),
-        recommendations=result.get("recommendations", [])
+        recommendations=result.get("recommendations", []),
+        language=CANONICAL_LANGUAGE
     )
+
+
+def translated_text(value, fallback: str) -> str:
+    """Use a translated string only if the model returned a non-empty string"""
+    return value if isinstance(value, str) and value.strip() else fallback
+
+
+async def translate_analysis(analysis: AnalyzeResponse, language: str) -> AnalyzeResponse:
+    """Translate the free-text fields of a canonical analysis in one batched call.
+    
+    Scores, issue types, severities, tiers and evidence quotes are shared
+    across languages and copied over verbatim. Any field the model drops,
+    mangles or returns with the wrong type keeps its canonical text.
+    """
+    source = {
+        "verdict": analysis.verdict,
+        "summary": analysis.summary,
+        "recommendations": analysis.recommendations,
+        "issues": [
+            {
+                "index": i,
+                "title": issue.title,
+                "description": issue.description,
+                "recommendation": issue.recommendation
+            }
+            for i, issue in enumerate(analysis.issues)
+        ]
+    }
+    
+    translated = await complete_json(
+        [
+            # Far below Haiku's 2048-token caching minimum, so no cache_control marker
+            {"role": "system", "content": TRANSLATION_PROMPT},
+            {
+                "role": "user",
+                "content": f"{json.dumps(source, ensure_ascii=False)}\n\nTarget language: {language}"
+            }
+        ],
+        model=TRANSLATION_MODEL,
+        max_tokens=TRANSLATION_MAX_TOKENS,
+        prompt_version=TRANSLATION_PROMPT_VERSION
+    )
+    if not isinstance(translated, dict):
+        translated = {}
+    
+    # Match issues by their echoed index so dropped or reordered items can't be misattributed
+    translated_issues = {}
+    issues_value = translated.get("issues")
+    for item in issues_value if isinstance(issues_value, list) else []:
+        if isinstance(item, dict) and isinstance(item.get("index"), int):
+            translated_issues[item["index"]] = item
+    
+    recommendations = translated.get("recommendations")
+    if not (
+        isinstance(recommendations, list)
+        and len(recommendations) == len(analysis.recommendations)
+        and all(isinstance(rec, str) and rec.strip() for rec in recommendations)
+    ):
+        recommendations = analysis.recommendations
+    
+    issues = []
+    for i, issue in enumerate(analysis.issues):
+        text = translated_issues.get(i, {})
+        issues.append({
+            **issue.model_dump(),
+            "title": translated_text(text.get("title"), issue.title),
+            "description": translated_text(text.get("description"), issue.description),
+            "recommendation": translated_text(text.get("recommendation"), issue.recommendation)
+        })
+    
+    return AnalyzeResponse.model_validate({
+        **analysis.model_dump(),
+        "verdict": translated_text(translated.get("verdict"), analysis.verdict),
+        "summary": translated_text(translated.get("summary"), analysis.summary),
+        "recommendations": recommendations,
+        "issues": issues,
+        "language": language
+    })
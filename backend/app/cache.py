@@ -0,0 +1,165 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+from app.analyzer import PROMPT_VERSION, CANONICAL_LANGUAGE
+from app.config import get_settings
+from app.schemas import AnalyzeResponse
+
+
+def normalize_content(content: str) -> str:
+    """Collapse whitespace so trivially different pastes share a cache entry.
+    
+    Line breaks are kept so tables stay readable; this is also the exact text
+    sent to the analyzer, so one cache key always means one prompt.
+    """
+    lines = (" ".join(line.split()) for line in content.splitlines())
+    return "\n".join(line for line in lines if line)[:15000]
+
+
+def cache_key(normalized_content: str) -> str:
+    """Stable key for normalized page content, scoped to the current prompt version"""
+    digest = hashlib.sha256(normalized_content.encode()).hexdigest()
+    return f"{PROMPT_VERSION}:{digest}"
+
+
+@dataclass
+class CacheEntry:
+    result: AnalyzeResponse
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class RequestStats:
+    content: str
+    tool_name: str | None
+    languages: set[str] = field(default_factory=set)
+    score: float = 0.0
+    updated_at: float = field(default_factory=time.time)
+    failures: int = 0
+    
+    def popularity(self, now: float, half_life_seconds: float) -> float:
+        """Request count with exponential decay, so old favourites fade out"""
+        return self.score * 0.5 ** ((now - self.updated_at) / half_life_seconds)
+
+
+class AnalysisCache:
+    """In-memory analysis results plus per-page request frequency.
+    
+    Each page has one canonical analysis stored under CANONICAL_LANGUAGE;
+    other languages hold translations of it and are dropped whenever the
+    canonical entry is replaced. Pages whose stats or canonical entry changed
+    are collected in ``dirty`` for AnalysisStore to persist.
+    """
+    
+    def __init__(self, ttl_seconds: int, max_entries: int, popularity_half_life_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.popularity_half_life_seconds = popularity_half_life_seconds
+        self.entries: dict[tuple[str, str], CacheEntry] = {}
+        self.stats: dict[str, RequestStats] = {}
+        self.dirty: set[str] = set()
+    
+    def get(self, key: str, language: str) -> AnalyzeResponse | None:
+        # Translations live and die with their canonical entry
+        canonical = self.entries.get((key, CANONICAL_LANGUAGE))
+        if canonical is None or time.time() - canonical.created_at > self.ttl_seconds:
+            self.drop(key)
+            return None
+        entry = self.entries.get((key, language))
+        return None if entry is None else entry.result
+    
+    def age(self, key: str, language: str) -> float | None:
+        entry = self.entries.get((key, language))
+        return None if entry is None else time.time() - entry.created_at
+    
+    def needs_refresh(self, key: str, margin_seconds: int) -> bool:
+        """Check whether a page's canonical analysis is missing or close to expiry"""
+        age = self.age(key, CANONICAL_LANGUAGE)
+        return age is None or age >= self.ttl_seconds - margin_seconds
+    
+    def drop(self, key: str, keep_canonical: bool = False) -> None:
+        """Remove a page's translations, and its canonical entry unless kept"""
+        for stale in [k for k in self.entries if k[0] == key]:
+            if not (keep_canonical and stale[1] == CANONICAL_LANGUAGE):
+                del self.entries[stale]
+                if stale[1] == CANONICAL_LANGUAGE:
+                    self.dirty.add(key)
+    
+    def set(self, key: str, language: str, result: AnalyzeResponse) -> AnalyzeResponse:
+        """Store a result and return it stamped with its analysis_id and language"""
+        result = result.model_copy(update={"analysis_id": key, "language": language})
+        
+        if language == CANONICAL_LANGUAGE:
+            self.drop(key, keep_canonical=True)
+        elif (key, CANONICAL_LANGUAGE) not in self.entries:
+            # Never keep a translation without the analysis it was made from
+            return result
+        
+        # Evict whole pages, oldest canonical first, so no translation is orphaned
+        while (key, language) not in self.entries and len(self.entries) >= self.max_entries:
+            canonical_ages = {
+                k: entry.created_at for (k, lang), entry in self.entries.items()
+                if lang == CANONICAL_LANGUAGE and k != key
+            }
+            if not canonical_ages:
+                break
+            self.drop(min(canonical_ages, key=canonical_ages.get))
+        
+        self.entries[(key, language)] = CacheEntry(result=result)
+        if language == CANONICAL_LANGUAGE:
+            self.dirty.add(key)
+        return result
+    
+    def restore(self, key: str, stats: RequestStats | None, canonical: CacheEntry | None) -> None:
+        """Load a persisted page without marking it dirty"""
+        if stats is not None:
+            self.stats[key] = stats
+        if canonical is not None:
+            self.entries[(key, CANONICAL_LANGUAGE)] = canonical
+    
+    def record_request(self, key: str, content: str, tool_name: str | None, language: str) -> None:
+        now = time.time()
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= self.max_entries:
+                rarest = min(self.stats, key=lambda k: self.popularity(self.stats[k], now))
+                del self.stats[rarest]
+                self.dirty.add(rarest)
+            stats = self.stats[key] = RequestStats(content=content, tool_name=tool_name)
+        stats.score = self.popularity(stats, now) + 1
+        stats.updated_at = now
+        stats.failures = 0
+        stats.languages.add(language)
+        self.dirty.add(key)
+    
+    def record_language(self, key: str, language: str) -> None:
+        """Remember a language a page was viewed in, without counting a request"""
+        stats = self.stats.get(key)
+        if stats is not None and language not in stats.languages:
+            stats.languages.add(language)
+            self.dirty.add(key)
+    
+    def popularity(self, stats: RequestStats, now: float) -> float:
+        return stats.popularity(now, self.popularity_half_life_seconds)
+    
+    def top(self, n: int) -> list[tuple[str, RequestStats]]:
+        """Most requested pages, most popular first"""
+        now = time.time()
+        ranked = sorted(
+            self.stats.items(), key=lambda item: self.popularity(item[1], now), reverse=True
+        )
+        return ranked[:n]
+    
+    def clear(self) -> None:
+        self.entries.clear()
+        self.stats.clear()
+        self.dirty.clear()
+
+
+_settings = get_settings()
+analysis_cache = AnalysisCache(
+    ttl_seconds=_settings.analysis_cache_ttl_seconds,
+    max_entries=_settings.analysis_cache_max_entries,
+    popularity_half_life_seconds=_settings.analysis_cache_popularity_half_life_seconds
+)
@@ -16,6 +16,25 @@ class Settings(BaseSettings):
     tool_name: str = "pricing-detective"
     debug: bool = False
     
+    # Analysis cache
+    analysis_cache_ttl_seconds: int = 7 * 24 * 3600
+    analysis_cache_max_entries: int = 1000
+    analysis_cache_popularity_half_life_seconds: int = 3 * 24 * 3600
+    
+    # Cache warmer (re-analyzes popular pages during off-peak hours, UTC).
+    # Pages are refreshed only when missing or within the margin of the 7-day
+    # TTL, so top_n / 7 ≈ 15 analyses plus up to 6 translations each ≈ 105
+    # calls a day fit the budget with room for failures and new pages.
+    cache_warmer_enabled: bool = True
+    cache_warmer_interval_seconds: int = 900
+    cache_warmer_jitter_seconds: int = 120
+    cache_warmer_top_n: int = 100
+    cache_warmer_refresh_before_expiry_seconds: int = 24 * 3600
+    cache_warmer_daily_budget: int = 150
+    cache_warmer_max_failures: int = 3
+    cache_warmer_offpeak_start_hour: int = 2
+    cache_warmer_offpeak_end_hour: int = 6
+    
     # Creem Payment
     creem_api_key: str = ""
     creem_webhook_secret: str = ""
@@ -1,16 +1,22 @@
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import logging
 import time
 
 from app.config import get_settings
-from app.schemas import AnalyzeRequest, AnalyzeResponse, HealthResponse
-from app.analyzer import analyze_pricing
+from app.schemas import AnalyzeRequest, AnalyzeResponse, HealthResponse, Language
+from app.analyzer import analyze_pricing, translate_analysis, CANONICAL_LANGUAGE
+from app.cache import analysis_cache, cache_key, normalize_content
+from app.store import analysis_store
+from app.warmer import cache_warmer
 from app.metrics import (
     metrics_router, http_requests, http_duration, 
-    free_trial_used, tokens_consumed, TOOL_NAME
+    free_trial_used, analyses_total, issues_detected, analysis_cache_lookups, TOOL_NAME
 )
 
+logger = logging.getLogger(__name__)
+
 # Simple in-memory storage for free trial tracking
 free_trials: dict[str, int] = {}
 FREE_TRIAL_LIMIT = 3
@@ -19,7 +25,11 @@ FREE_TRIAL_LIMIT = 3
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan"""
+    await analysis_store.load(analysis_cache)
+    if get_settings().cache_warmer_enabled:
+        cache_warmer.start()
     yield
+    await cache_warmer.stop()
 
 
 app = FastAPI(
@@ -61,6 +71,16 @@ async def track_requests(request, call_next):
     return response
 
 
+async def localize(key: str, canonical: AnalyzeResponse, language: Language) -> AnalyzeResponse:
+    """Translate a canonical analysis and cache the result"""
+    if language == CANONICAL_LANGUAGE:
+        return canonical
+    
+    async with cache_warmer.live_request():
+        translated = await translate_analysis(canonical, language)
+    return analysis_cache.set(key, language, translated)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Health check endpoint"""
@@ -92,18 +112,80 @@ async def analyze(
     free_trials[x_device_id] = uses + 1
     free_trial_used.labels(tool=TOOL_NAME).inc()
     
+    content = normalize_content(request.content)
+    key = cache_key(content)
+    
+    result = analysis_cache.get(key, request.language)
+    if result is not None:
+        analysis_cache_lookups.labels(tool=TOOL_NAME, result="hit").inc()
+    else:
+        try:
+            canonical = analysis_cache.get(key, CANONICAL_LANGUAGE)
+            if canonical is None:
+                analysis_cache_lookups.labels(tool=TOOL_NAME, result="miss").inc()
+                async with cache_warmer.live_request():
+                    canonical = await analyze_pricing(
+                        content=content,
+                        tool_name=request.tool_name
+                    )
+                canonical = analysis_cache.set(key, CANONICAL_LANGUAGE, canonical)
+            else:
+                analysis_cache_lookups.labels(tool=TOOL_NAME, result="translate").inc()
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Analysis failed: {str(e)}"
+            )
+        
+        # The analysis itself succeeded; serve it in English rather than
+        # failing the request, and let the client retry the translation
+        try:
+            result = await localize(key, canonical, request.language)
+        except Exception:
+            logger.exception("Translation of %s into %s failed", key, request.language)
+            result = canonical
+    
+    # Only successful analyses count towards popularity, so the warmer
+    # never retries pages that fail
+    analysis_cache.record_request(key, content, request.tool_name, request.language)
+    await analysis_store.flush(analysis_cache)
+    
+    # Track metrics (user analyses only, whether served from cache or not)
+    analyses_total.labels(tool=TOOL_NAME).inc()
+    for issue in result.issues:
+        issues_detected.labels(tool=TOOL_NAME, issue_type=issue.type.value).inc()
+    
+    return result
+
+
+@app.get("/api/v1/analysis/{analysis_id}", response_model=AnalyzeResponse)
+async def get_analysis(analysis_id: str, language: Language = Query(default="en")):
+    """
+    Fetch a previous analysis in another language.
+    
+    Served from cache, or translated from the stored canonical analysis
+    with a single small LLM call. Does not use a free trial.
+    """
+    # Let the warmer rebuild this translation after the next refresh
+    analysis_cache.record_language(analysis_id, language)
+    await analysis_store.flush(analysis_cache)
+    
+    cached = analysis_cache.get(analysis_id, language)
+    if cached is not None:
+        analysis_cache_lookups.labels(tool=TOOL_NAME, result="hit").inc()
+        return cached
+    
+    canonical = analysis_cache.get(analysis_id, CANONICAL_LANGUAGE)
+    if canonical is None:
+        raise HTTPException(status_code=404, detail="Analysis expired. Please analyze the page again.")
+    analysis_cache_lookups.labels(tool=TOOL_NAME, result="translate").inc()
+    
     try:
-        result = await analyze_pricing(
-            content=request.content,
-            tool_name=request.tool_name,
-            language=request.language
-        )
-        tokens_consumed.labels(tool=TOOL_NAME).inc()
-        return result
+        return await localize(analysis_id, canonical, language)
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+            detail=f"Translation failed: {str(e)}"
         )
 
 
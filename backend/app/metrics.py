@@ -39,10 +39,36 @@ free_trial_used = Counter(
 
 tokens_consumed = Counter(
     "tokens_consumed_total",
-    "Tokens consumed",
+    "LLM tokens consumed (prompt includes cached; cached/cache_write are prompt-cache reads/writes)",
+    ["tool", "token_type", "prompt_version"]
+)
+
+# Cache Metrics
+analysis_cache_lookups = Counter(
+    "analysis_cache_lookups_total",
+    "Analysis cache lookups",
+    ["tool", "result"]
+)
+
+cache_warmer_analyses = Counter(
+    "cache_warmer_analyses_total",
+    "Background re-analyses performed by the cache warmer",
+    ["tool", "status"]
+)
+
+cache_warmer_budget_remaining = Gauge(
+    "cache_warmer_budget_remaining",
+    "LLM calls left in the cache warmer's daily budget",
     ["tool"]
 )
 
+cache_warmer_jitter = Histogram(
+    "cache_warmer_jitter_seconds",
+    "Random delay added to each cache warmer cycle",
+    ["tool"],
+    buckets=(0, 15, 30, 60, 120, 300, 600)
+)
+
 # Payment Metrics
 payment_success = Counter(
     "payment_success_total",
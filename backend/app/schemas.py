@@ -1,8 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from enum import Enum
 
 
+# UI languages; analyses are translated into these on demand
+Language = Literal["en", "zh", "ja", "de", "fr", "ko", "es"]
+
+
 class SeverityLevel(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
@@ -44,7 +48,7 @@ class AnalyzeRequest(BaseModel):
     """Request to analyze pricing content"""
     content: str = Field(description="Pricing page content (HTML or text)", min_length=50)
     tool_name: Optional[str] = Field(default=None, description="Name of the SaaS tool")
-    language: str = Field(default="en", description="Response language code")
+    language: Language = Field(default="en", description="Response language code")
 
 
 class AnalyzeResponse(BaseModel):
@@ -56,6 +60,8 @@ class AnalyzeResponse(BaseModel):
     tiers: list[TierAnalysis]
     summary: str
     recommendations: list[str]
+    analysis_id: Optional[str] = Field(default=None, description="Cache key for fetching this analysis in other languages")
+    language: Language = Field(default="en", description="Language of the free-text fields")
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,129 @@
+import json
+import logging
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, Text, delete, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.analyzer import PROMPT_VERSION, CANONICAL_LANGUAGE
+from app.cache import AnalysisCache, CacheEntry, RequestStats, cache_key
+from app.config import get_settings
+from app.schemas import AnalyzeResponse
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per page: request stats plus its canonical analysis, so both
+# survive restarts and deploys. Translations are cheap and not persisted.
+analysis_pages = Table(
+    "analysis_pages",
+    metadata,
+    Column("key", String, primary_key=True),
+    Column("prompt_version", String, nullable=False),
+    Column("content", Text),
+    Column("tool_name", String),
+    Column("languages", Text, nullable=False, default="[]"),
+    Column("score", Float, nullable=False, default=0.0),
+    Column("updated_at", Float),
+    Column("failures", Integer, nullable=False, default=0),
+    Column("result", Text),
+    Column("result_created_at", Float),
+)
+
+
+class AnalysisStore:
+    """Persists AnalysisCache pages to the database"""
+
+    def __init__(self, database_url: str):
+        # NullPool: connections are opened per operation, so the engine is
+        # safe to use from whichever event loop is running
+        self.engine = create_async_engine(database_url, poolclass=NullPool)
+        self._ready = False
+
+    async def init(self) -> None:
+        if self._ready:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self._ready = True
+
+    async def load(self, cache: AnalysisCache) -> int:
+        """Restore persisted pages into the cache; returns the number loaded.
+
+        Pages stored under an older PROMPT_VERSION are re-keyed for the current
+        version without their analysis, so the warmer re-analyzes them.
+        """
+        await self.init()
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(select(analysis_pages))).mappings().all()
+
+        for row in rows:
+            stats = None
+            if row["content"] is not None:
+                stats = RequestStats(
+                    content=row["content"],
+                    tool_name=row["tool_name"],
+                    languages=set(json.loads(row["languages"])),
+                    score=row["score"],
+                    updated_at=row["updated_at"],
+                    failures=row["failures"]
+                )
+
+            if row["prompt_version"] != PROMPT_VERSION:
+                cache.dirty.add(row["key"])
+                if stats is not None:
+                    key = cache_key(stats.content)
+                    cache.restore(key, stats, None)
+                    cache.dirty.add(key)
+                continue
+
+            canonical = None
+            if row["result"] is not None:
+                canonical = CacheEntry(
+                    result=AnalyzeResponse.model_validate_json(row["result"]),
+                    created_at=row["result_created_at"]
+                )
+            cache.restore(row["key"], stats, canonical)
+
+        await self.flush(cache)
+        return len(rows)
+
+    async def flush(self, cache: AnalysisCache) -> None:
+        """Write every dirty page to the database; failures are logged, not raised"""
+        keys, cache.dirty = cache.dirty, set()
+        if not keys:
+            return
+
+        try:
+            await self.init()
+            async with self.engine.begin() as conn:
+                await conn.execute(delete(analysis_pages).where(analysis_pages.c.key.in_(keys)))
+                rows = [row for row in (self._row(cache, key) for key in keys) if row is not None]
+                if rows:
+                    await conn.execute(insert(analysis_pages), rows)
+        except Exception:
+            logger.exception("Failed to persist %d analysis pages", len(keys))
+            cache.dirty |= keys
+
+    @staticmethod
+    def _row(cache: AnalysisCache, key: str) -> dict | None:
+        stats = cache.stats.get(key)
+        entry = cache.entries.get((key, CANONICAL_LANGUAGE))
+        if stats is None and entry is None:
+            return None
+        return {
+            "key": key,
+            "prompt_version": key.split(":", 1)[0],
+            "content": stats.content if stats else None,
+            "tool_name": stats.tool_name if stats else None,
+            "languages": json.dumps(sorted(stats.languages) if stats else []),
+            "score": stats.score if stats else 0.0,
+            "updated_at": stats.updated_at if stats else None,
+            "failures": stats.failures if stats else 0,
+            "result": entry.result.model_dump_json() if entry else None,
+            "result_created_at": entry.created_at if entry else None,
+        }
+
+
+analysis_store = AnalysisStore(get_settings().database_url)
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timezone
+
+from app.analyzer import analyze_pricing, translate_analysis, CANONICAL_LANGUAGE
+from app.cache import AnalysisCache, analysis_cache
+from app.config import get_settings
+from app.store import AnalysisStore, analysis_store
+from app.metrics import (
+    cache_warmer_analyses, cache_warmer_budget_remaining, cache_warmer_jitter, TOOL_NAME
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Preempted(Exception):
+    """A live request started while the warmer was calling upstream"""
+
+
+def in_offpeak_window(hour: int, start: int, end: int) -> bool:
+    """Check whether a UTC hour falls in [start, end), wrapping past midnight"""
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class CacheWarmer:
+    """Background task that keeps the most requested analyses hot.
+    
+    Live traffic always has priority: the warmer only starts an upstream call
+    while no live request is in flight, and cancels its own call as soon as
+    one arrives, so the two never run upstream at the same time.
+    """
+    
+    def __init__(self, cache: AnalysisCache, store: AnalysisStore):
+        self.cache = cache
+        self.store = store
+        self.live_requests = 0
+        self.budget_day: str | None = None
+        self.budget_used = 0
+        self._task: asyncio.Task | None = None
+        self._live = asyncio.Event()
+    
+    @asynccontextmanager
+    async def live_request(self):
+        """Mark a live LLM call in flight so the warmer backs off"""
+        self.live_requests += 1
+        self._live.set()
+        try:
+            yield
+        finally:
+            self.live_requests -= 1
+            if self.live_requests == 0:
+                self._live.clear()
+    
+    async def call_upstream(self, coro):
+        """Run a warmer LLM call, cancelling it if live traffic shows up"""
+        call = asyncio.ensure_future(coro)
+        live = asyncio.ensure_future(self._live.wait())
+        await asyncio.wait({call, live}, return_when=asyncio.FIRST_COMPLETED)
+        live.cancel()
+        if call.done():
+            return call.result()
+        
+        call.cancel()
+        with suppress(asyncio.CancelledError):
+            await call
+        cache_warmer_analyses.labels(tool=TOOL_NAME, status="preempted").inc()
+        raise Preempted()
+    
+    def budget_remaining(self) -> int:
+        settings = get_settings()
+        today = datetime.now(timezone.utc).date().isoformat()
+        if self.budget_day != today:
+            self.budget_day = today
+            self.budget_used = 0
+        remaining = max(0, settings.cache_warmer_daily_budget - self.budget_used)
+        cache_warmer_budget_remaining.labels(tool=TOOL_NAME).set(remaining)
+        return remaining
+    
+    def spend(self) -> None:
+        self.budget_used += 1
+        self.budget_remaining()
+    
+    def can_call(self) -> bool:
+        """Check the budget and back off if live traffic is using the upstream"""
+        if self.budget_remaining() <= 0:
+            return False
+        # Never compete with live traffic for upstream concurrency
+        if self.live_requests > 0:
+            cache_warmer_analyses.labels(tool=TOOL_NAME, status="deferred").inc()
+            return False
+        return True
+    
+    async def run_once(self) -> int:
+        """Refresh missing or expiring popular entries; returns the number of LLM calls made.
+        
+        Preempted calls are not charged to the budget or counted.
+        """
+        settings = get_settings()
+        calls = 0
+        
+        try:
+            for key, stats in self.cache.top(settings.cache_warmer_top_n):
+                if stats.failures >= settings.cache_warmer_max_failures:
+                    continue
+                
+                canonical = self.cache.get(key, CANONICAL_LANGUAGE)
+                if canonical is None or self.cache.needs_refresh(
+                    key, settings.cache_warmer_refresh_before_expiry_seconds
+                ):
+                    if not self.can_call():
+                        return calls
+                    try:
+                        canonical = await self.call_upstream(analyze_pricing(
+                            content=stats.content,
+                            tool_name=stats.tool_name
+                        ))
+                    except Preempted:
+                        return calls
+                    except Exception:
+                        self.spend()
+                        calls += 1
+                        logger.exception("Cache warmer failed to analyze %s", key)
+                        cache_warmer_analyses.labels(tool=TOOL_NAME, status="error").inc()
+                        stats.failures += 1
+                        self.cache.dirty.add(key)
+                        continue
+                    self.spend()
+                    calls += 1
+                    canonical = self.cache.set(key, CANONICAL_LANGUAGE, canonical)
+                    cache_warmer_analyses.labels(tool=TOOL_NAME, status="ok").inc()
+                
+                for language in sorted(stats.languages - {CANONICAL_LANGUAGE}):
+                    if self.cache.get(key, language) is not None:
+                        continue
+                    if not self.can_call():
+                        return calls
+                    try:
+                        translated = await self.call_upstream(translate_analysis(canonical, language))
+                    except Preempted:
+                        return calls
+                    except Exception:
+                        self.spend()
+                        calls += 1
+                        logger.exception("Cache warmer failed to translate %s into %s", key, language)
+                        cache_warmer_analyses.labels(tool=TOOL_NAME, status="error").inc()
+                        continue
+                    self.spend()
+                    calls += 1
+                    self.cache.set(key, language, translated)
+                    cache_warmer_analyses.labels(tool=TOOL_NAME, status="ok").inc()
+        finally:
+            await self.store.flush(self.cache)
+        
+        return calls
+    
+    async def _loop(self) -> None:
+        settings = get_settings()
+        while True:
+            jitter = random.uniform(0, settings.cache_warmer_jitter_seconds)
+            cache_warmer_jitter.labels(tool=TOOL_NAME).observe(jitter)
+            await asyncio.sleep(settings.cache_warmer_interval_seconds + jitter)
+            
+            hour = datetime.now(timezone.utc).hour
+            if not in_offpeak_window(
+                hour,
+                settings.cache_warmer_offpeak_start_hour,
+                settings.cache_warmer_offpeak_end_hour
+            ):
+                continue
+            
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Cache warmer cycle failed")
+    
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+cache_warmer = CacheWarmer(analysis_cache, analysis_store)
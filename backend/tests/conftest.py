@@ -1,7 +1,22 @@
+import os
+import tempfile
 import pytest
+
+# Keep test runs away from the real database
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from app.main import app
+from app.cache import analysis_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_analysis_cache():
+    """Start every test with an empty analysis cache"""
+    analysis_cache.clear()
+    yield
+    analysis_cache.clear()
 
 
 @pytest.fixture
@@ -54,7 +69,7 @@ def mock_analyze(mock_llm_response):
     import json
     
     async def mock_post(*args, **kwargs):
-        mock_response = AsyncMock()
+        mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             "choices": [{
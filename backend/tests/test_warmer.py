@@ -0,0 +1,307 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from app.cache import AnalysisCache, cache_key, normalize_content
+from app.config import get_settings
+from app.schemas import AnalyzeResponse
+from app.store import AnalysisStore
+from app.warmer import CacheWarmer, in_offpeak_window
+
+
+def make_result(tool_name: str) -> AnalyzeResponse:
+    return AnalyzeResponse(
+        tool_name=tool_name,
+        overall_score=80,
+        verdict="Mostly honest",
+        issues=[],
+        tiers=[],
+        summary="No major issues found",
+        recommendations=[]
+    )
+
+
+def page(name: str) -> tuple[str, str]:
+    """Normalized content and cache key for a test pricing page"""
+    content = normalize_content(f"{name} pricing page content " * 5)
+    return content, cache_key(content)
+
+
+@pytest.fixture
+def cache():
+    cache = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+    for name, hits in (("Popular", 5), ("Rare", 1)):
+        content, key = page(name)
+        for _ in range(hits):
+            cache.record_request(key, content, name, "en")
+    return cache
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalysisStore(f"sqlite+aiosqlite:///{tmp_path}/analysis.db")
+
+
+@pytest.fixture
+def warmer(cache, store, monkeypatch):
+    # Refresh only within the last 10 minutes of the fixture cache's 1h TTL
+    monkeypatch.setattr(get_settings(), "cache_warmer_refresh_before_expiry_seconds", 600)
+    return CacheWarmer(cache, store)
+
+
+@pytest.fixture
+def daily_budget(monkeypatch):
+    """Set the warmer's daily LLM budget through settings"""
+    def set_budget(budget: int):
+        monkeypatch.setattr(get_settings(), "cache_warmer_daily_budget", budget)
+    return set_budget
+
+
+class TestOffpeakWindow:
+    def test_same_day_window(self):
+        assert in_offpeak_window(3, 2, 6)
+        assert not in_offpeak_window(6, 2, 6)
+    
+    def test_window_wraps_midnight(self):
+        assert in_offpeak_window(23, 22, 4)
+        assert in_offpeak_window(1, 22, 4)
+        assert not in_offpeak_window(12, 22, 4)
+
+
+class TestCacheWarmer:
+    def test_top_orders_by_frequency(self, cache):
+        """Test most requested pages come first"""
+        assert [stats.tool_name for _, stats in cache.top(2)] == ["Popular", "Rare"]
+    
+    def test_run_once_warms_popular_within_budget(self, cache, daily_budget, warmer):
+        """Test warmer fills the cache for top pages and stops at budget"""
+        daily_budget(1)
+        mock = AsyncMock(side_effect=lambda content, tool_name: make_result(tool_name))
+        
+        with patch("app.warmer.analyze_pricing", mock):
+            assert asyncio.run(warmer.run_once()) == 1
+            assert asyncio.run(warmer.run_once()) == 0
+        
+        assert warmer.budget_used == 1
+        assert warmer.budget_remaining() == 0
+        assert mock.call_count == 1
+        assert cache.get(page("Popular")[1], "en").tool_name == "Popular"
+        assert cache.get(page("Rare")[1], "en") is None
+    
+    def test_budget_resets_daily(self, cache, daily_budget, warmer):
+        """Test the budget counter resets when the UTC day changes"""
+        daily_budget(1)
+        warmer.budget_day = "2000-01-01"
+        warmer.budget_used = 1
+        
+        assert warmer.budget_remaining() == 1
+        assert warmer.budget_used == 0
+    
+    def test_run_once_skips_fresh_entries(self, cache, warmer):
+        """Test entries refreshed recently are not re-analyzed"""
+        for key, stats in cache.top(2):
+            cache.set(key, "en", make_result(stats.tool_name))
+        
+        mock = AsyncMock()
+        with patch("app.warmer.analyze_pricing", mock):
+            calls = asyncio.run(warmer.run_once())
+        
+        assert calls == 0
+        mock.assert_not_called()
+    
+    def test_run_once_refreshes_entries_near_expiry(self, cache, warmer):
+        """Test only entries within the refresh margin of their TTL are re-analyzed"""
+        popular, rare = page("Popular")[1], page("Rare")[1]
+        cache.set(popular, "en", make_result("Popular"))
+        cache.set(rare, "en", make_result("Rare"))
+        cache.entries[(popular, "en")].created_at -= 3300
+        
+        mock = AsyncMock(side_effect=lambda content, tool_name: make_result(tool_name))
+        with patch("app.warmer.analyze_pricing", mock):
+            calls = asyncio.run(warmer.run_once())
+        
+        assert calls == 1
+        assert mock.call_args.kwargs["tool_name"] == "Popular"
+        assert cache.age(popular, "en") < 60
+    
+    def test_run_once_gives_up_after_repeated_failures(self, cache, warmer, monkeypatch):
+        """Test pages that keep failing stop consuming the budget"""
+        monkeypatch.setattr(get_settings(), "cache_warmer_max_failures", 2)
+        cache.set(page("Rare")[1], "en", make_result("Rare"))
+        
+        mock = AsyncMock(side_effect=ValueError("bad JSON"))
+        with patch("app.warmer.analyze_pricing", mock):
+            assert [asyncio.run(warmer.run_once()) for _ in range(3)] == [1, 1, 0]
+        
+        assert cache.stats[page("Popular")[1]].failures == 2
+    
+    def test_run_once_translates_requested_languages(self, cache, warmer):
+        """Test warmer refreshes the canonical analysis once, then translates it"""
+        content, key = page("Popular")
+        cache.record_request(key, content, "Popular", "ja")
+        
+        analyze = AsyncMock(side_effect=lambda content, tool_name: make_result(tool_name))
+        translate = AsyncMock(side_effect=lambda analysis, language: analysis.model_copy(
+            update={"verdict": f"[{language}] {analysis.verdict}"}
+        ))
+        with patch("app.warmer.analyze_pricing", analyze), \
+                patch("app.warmer.translate_analysis", translate):
+            calls = asyncio.run(warmer.run_once())
+        
+        assert calls == 3
+        assert analyze.call_count == 2
+        assert translate.call_count == 1
+        assert cache.get(key, "ja").verdict == "[ja] Mostly honest"
+    
+    def test_run_once_defers_to_live_traffic(self, cache, warmer):
+        """Test warmer makes no upstream calls while live requests are in flight"""
+        warmer.live_requests = 1
+        
+        mock = AsyncMock()
+        with patch("app.warmer.analyze_pricing", mock):
+            calls = asyncio.run(warmer.run_once())
+        
+        assert calls == 0
+        mock.assert_not_called()
+    
+    def test_live_request_preempts_warmer_call(self, cache, warmer):
+        """Test an in-flight warmer call is cancelled when live traffic starts"""
+        cancelled = False
+        
+        async def slow_analyze(content, tool_name):
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+        
+        async def scenario():
+            run = asyncio.create_task(warmer.run_once())
+            await asyncio.sleep(0.01)
+            async with warmer.live_request():
+                return await run
+        
+        with patch("app.warmer.analyze_pricing", slow_analyze):
+            calls = asyncio.run(scenario())
+        
+        assert calls == 0
+        assert warmer.budget_used == 0
+        assert cancelled
+        assert cache.get(page("Popular")[1], "en") is None
+    
+    def test_start_stop(self, cache, warmer):
+        """Test the background task can be started and stopped cleanly"""
+        
+        async def lifecycle():
+            warmer.start()
+            assert warmer._task is not None
+            await warmer.stop()
+            assert warmer._task is None
+        
+        asyncio.run(lifecycle())
+
+
+class TestAnalysisCache:
+    def test_canonical_refresh_drops_translations(self):
+        """Test translations are invalidated when the canonical analysis changes"""
+        cache = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        
+        stored = cache.set("key", "en", make_result("Tool"))
+        cache.set("key", "ja", make_result("Tool"))
+        assert stored.analysis_id == "key"
+        assert cache.get("key", "ja").language == "ja"
+        
+        cache.set("key", "en", make_result("Tool"))
+        assert cache.get("key", "ja") is None
+        assert cache.get("key", "en") is not None
+    
+    def test_popularity_decays(self, cache):
+        """Test old request counts fade so newly popular pages can overtake them"""
+        content, key = page("Trending")
+        with patch("app.cache.time.time", return_value=cache.stats[page("Popular")[1]].updated_at + 4 * 3600):
+            for _ in range(2):
+                cache.record_request(key, content, "Trending", "en")
+            ranked = [stats.tool_name for _, stats in cache.top(3)]
+        
+        assert ranked == ["Trending", "Popular", "Rare"]
+    
+    def test_normalize_content_keeps_lines(self):
+        """Test whitespace variants share a key while line structure is kept"""
+        a = normalize_content("Pro   plan\t$19/mo\n\n\nTeam plan $49/mo  ")
+        b = normalize_content("  Pro plan $19/mo\r\nTeam   plan $49/mo")
+        
+        assert a == b == "Pro plan $19/mo\nTeam plan $49/mo"
+        assert cache_key(a) == cache_key(b)
+    
+    def test_eviction_drops_whole_pages(self):
+        """Test eviction removes a canonical entry together with its translations"""
+        cache = AnalysisCache(ttl_seconds=3600, max_entries=3, popularity_half_life_seconds=3600)
+        cache.set("old", "en", make_result("Old"))
+        cache.set("old", "ja", make_result("Old"))
+        cache.set("new", "en", make_result("New"))
+        cache.set("new", "de", make_result("New"))
+        
+        assert ("old", "ja") not in cache.entries
+        assert cache.get("old", "en") is None
+        assert cache.get("new", "de") is not None
+    
+    def test_translations_expire_with_canonical(self):
+        """Test a translation is not served once its canonical entry has expired"""
+        cache = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        cache.set("key", "en", make_result("Tool"))
+        cache.entries[("key", "en")].created_at -= 7200
+        cache.set("key", "ja", make_result("Tool"))
+        
+        assert cache.get("key", "ja") is None
+        assert cache.entries == {}
+    
+    def test_translation_without_canonical_is_not_stored(self):
+        """Test orphan translations are never cached"""
+        cache = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        cache.set("key", "ja", make_result("Tool"))
+        assert cache.entries == {}
+
+
+class TestAnalysisStore:
+    def test_pages_survive_restart(self, cache, store):
+        """Test stats and canonical analyses are restored into a fresh cache"""
+        popular = page("Popular")[1]
+        cache.set(popular, "en", make_result("Popular"))
+        cache.set(popular, "ja", make_result("Popular"))
+        asyncio.run(store.flush(cache))
+        
+        restored = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        assert asyncio.run(store.load(restored)) == 2
+        
+        assert restored.get(popular, "en").tool_name == "Popular"
+        assert restored.get(popular, "ja") is None
+        assert [stats.tool_name for _, stats in restored.top(2)] == ["Popular", "Rare"]
+        assert restored.stats[popular].score == cache.stats[popular].score
+    
+    def test_evicted_pages_are_deleted(self, store):
+        """Test pages evicted from the cache are removed from the database"""
+        cache = AnalysisCache(ttl_seconds=3600, max_entries=1, popularity_half_life_seconds=3600)
+        for name in ("First", "Second"):
+            content, key = page(name)
+            cache.record_request(key, content, name, "en")
+        asyncio.run(store.flush(cache))
+        
+        restored = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        assert asyncio.run(store.load(restored)) == 1
+        assert [stats.tool_name for _, stats in restored.top(2)] == ["Second"]
+    
+    def test_older_prompt_version_is_rekeyed_without_analysis(self, cache, store):
+        """Test pages from an older prompt version come back unanalyzed under the current key"""
+        content, key = page("Popular")
+        cache.set(key, "en", make_result("Popular"))
+        asyncio.run(store.flush(cache))
+        
+        restored = AnalysisCache(ttl_seconds=3600, max_entries=10, popularity_half_life_seconds=3600)
+        with patch("app.store.PROMPT_VERSION", "next"), patch("app.cache.PROMPT_VERSION", "next"):
+            asyncio.run(store.load(restored))
+            new_key = cache_key(content)
+        
+        assert new_key != key
+        assert key not in restored.stats
+        assert restored.stats[new_key].tool_name == "Popular"
+        assert restored.get(new_key, "en") is None
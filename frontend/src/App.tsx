@@ -2,7 +2,7 @@ import { useEffect } from 'react'
 import { useTranslation } from 'react-i18next'
 import { Search, AlertTriangle, CheckCircle, XCircle, Globe, Zap } from 'lucide-react'
 import { useAppStore } from './lib/store'
-import { analyzePricing, getTrialStatus } from './lib/api'
+import { analyzePricing, getAnalysis, getTrialStatus } from './lib/api'
 
 const LANGUAGES = [
   { code: 'en', name: 'English', flag: '🇺🇸' },
@@ -127,11 +127,32 @@ function App() {
     error, setError,
     trialStatus, setTrialStatus,
   } = useAppStore()
+  // Resolved to one of the bundled locales, which the API also accepts
+  const language = (i18n.resolvedLanguage || 'en').split('-')[0]
   
   useEffect(() => {
     getTrialStatus().then(setTrialStatus).catch(console.error)
   }, [setTrialStatus])
   
+  // Re-localize the current result from the server cache on language switch
+  useEffect(() => {
+    if (!result?.analysis_id || !result.language || result.language === language) return
+    
+    // Ignore responses for a language the user has already switched away from
+    let current = true
+    getAnalysis(result.analysis_id, language)
+      .then((res) => {
+        if (current && res.language === language) setResult(res)
+      })
+      .catch((err: Error) => {
+        // getAnalysis always rejects with the API's detail message, e.g. "Analysis expired"
+        if (current) setError(err.message)
+      })
+    return () => {
+      current = false
+    }
+  }, [language, result, setResult, setError])
+  
   const handleAnalyze = async () => {
     if (content.length < 50) {
       setError(t('minLength'))
@@ -142,7 +163,7 @@ function App() {
     setError(null)
     
     try {
-      const res = await analyzePricing(content, toolName || null, i18n.language.split('-')[0])
+      const res = await analyzePricing(content, toolName || null, language)
       setResult(res)
       // Refresh trial status
       const status = await getTrialStatus()
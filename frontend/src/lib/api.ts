@@ -25,6 +25,8 @@ export interface AnalysisResult {
   tiers: TierAnalysis[]
   summary: string
   recommendations: string[]
+  analysis_id?: string | null
+  language?: string
 }
 
 export interface TrialStatus {
@@ -76,6 +78,24 @@ export async function analyzePricing(
   return response.json()
 }
 
+export async function getAnalysis(
+  analysisId: string,
+  language: string
+): Promise<AnalysisResult> {
+  const params = new URLSearchParams({ language })
+  const response = await fetch(`/api/v1/analysis/${encodeURIComponent(analysisId)}?${params}`)
+  
+  if (!response.ok) {
+    const data = await response.json()
+    const errorMessage = typeof data.detail === 'string' 
+      ? data.detail 
+      : data.detail?.error || data.detail?.message || 'Failed to load analysis'
+    throw new Error(errorMessage)
+  }
+  
+  return response.json()
+}
+
 export async function getTrialStatus(): Promise<TrialStatus> {
   const id = await getDeviceId()
   
@@ -1,5 +1,5 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest'
-import { analyzePricing, getTrialStatus } from '../lib/api'
+import { analyzePricing, getAnalysis, getTrialStatus } from '../lib/api'
 
 describe('API', () => {
   beforeEach(() => {
@@ -82,6 +82,29 @@ describe('API', () => {
     })
   })
   
+  describe('getAnalysis', () => {
+    it('requests the analysis in the given language', async () => {
+      global.fetch = vi.fn().mockResolvedValue({
+        ok: true,
+        json: () => Promise.resolve({ tool_name: 'Test', language: 'ja', analysis_id: 'abc' }),
+      })
+      
+      const result = await getAnalysis('abc', 'ja')
+      expect(global.fetch).toHaveBeenCalledWith('/api/v1/analysis/abc?language=ja')
+      expect(result.language).toBe('ja')
+    })
+    
+    it('handles string error detail', async () => {
+      global.fetch = vi.fn().mockResolvedValue({
+        ok: false,
+        status: 404,
+        json: () => Promise.resolve({ detail: 'Analysis expired. Please analyze the page again.' }),
+      })
+      
+      await expect(getAnalysis('abc', 'de')).rejects.toThrow('Analysis expired')
+    })
+  })
+  
   describe('getTrialStatus', () => {
     it('returns trial status', async () => {
       global.fetch = vi.fn().mockResolvedValue({